@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.nats.client import (
+    dropped_events_count,
+    is_nats_buffer_full,
+    is_nats_connected,
+    pending_events_count,
+)
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def liveness():
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness(request: Request):
+    db_ready = getattr(request.app.state, "db_ready", False)
+    nats_connected = is_nats_connected()
+
+    # В режиме "fast" сервис работает и без NATS, пока события помещаются в буфер;
+    # переполненный буфер означает потерю событий - сервис не готов
+    if settings.STARTUP_MODE == "fast":
+        nats_ok = nats_connected or not is_nats_buffer_full()
+    else:
+        nats_ok = nats_connected
+    ready = db_ready and nats_ok
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "startup_mode": settings.STARTUP_MODE,
+            "checks": {
+                "database": db_ready,
+                "nats": nats_connected,
+                "nats_buffer": not is_nats_buffer_full(),
+            },
+            "nats_pending_events": pending_events_count(),
+            "nats_dropped_events": dropped_events_count(),
+        }
+    )
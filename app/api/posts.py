@@ -3,7 +3,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.schemas.post import RSSPostCreate, RSSPostUpdate, RSSPostResponse
-from app.services.rss import fetch_rss_feed, save_posts_to_db
+from app.services.rss import run_ingest_once, compute_content_hash
 from app.nats.client import publish_post_event
 from app.ws.manager import manager
 from app.models.post import RSSPost
@@ -43,7 +43,10 @@ async def create_post(post: RSSPostCreate, db: AsyncSession = Depends(get_db)):
     if existing.fetchone():
         raise HTTPException(400, "Post with this link already exists")
 
-    db_post = RSSPost(**post.model_dump())
+    db_post = RSSPost(
+        **post.model_dump(),
+        content_hash=compute_content_hash(post.title, post.summary, post.category, post.author)
+    )
     db.add(db_post)
     await db.commit()
     await db.refresh(db_post)
@@ -73,6 +76,8 @@ async def update_post(post_id: int, update_data: RSSPostUpdate, db: AsyncSession
     if not update_dict:
         return RSSPostResponse.model_validate(dict(row._mapping))
 
+    # content_hash не трогаем: он отражает последнюю версию из RSS,
+    # иначе следующий цикл парсинга перезапишет ручную правку
     set_clause = ", ".join([f"{k} = :{k}" for k in update_dict])
     update_dict["id"] = post_id
 
@@ -109,10 +114,6 @@ async def delete_post(post_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.post("/run")
-async def run_rss_fetch(db: AsyncSession = Depends(get_db)):
-    posts = await fetch_rss_feed()
-    if not posts:
-        return {"status": "error", "message": "Не удалось получить RSS"}
-
-    added = await save_posts_to_db(posts, db)
-    return {"status": "ok", "added": added}
\ No newline at end of file
+async def run_rss_fetch():
+    # Параллельные вызовы разделяют один идущий цикл парсинга
+    return await run_ingest_once()
\ No newline at end of file
@@ -7,8 +7,21 @@ class Settings(BaseSettings):
     BACKGROUND_TASK_INTERVAL: int = 300  # 5 минут
     NATS_URL: str = "nats://localhost:4222"
     NATS_SUBJECT: str = "rss.updates"
+    # "fast" - NATS подключается в фоне, "strict" - старт ждёт подключения к NATS
+    STARTUP_MODE: str = "fast"
+    NATS_CONNECT_TIMEOUT: int = 2  # секунды
+    NATS_RECONNECT_MIN_DELAY: float = 1.0  # секунды
+    NATS_RECONNECT_MAX_DELAY: float = 60.0  # секунды
+    NATS_BUFFER_SIZE: int = 1000  # событий до подключения
+    ADMISSION_MAX_CONCURRENCY: int = 32  # одновременных REST-запросов всего
+    ADMISSION_MAX_QUEUE: int = 64
+    ADMISSION_READ_ROUTE_LIMIT: int = 16  # на один маршрут чтения
+    ADMISSION_WRITE_ROUTE_LIMIT: int = 4  # на один маршрут записи
+    ADMISSION_ROUTE_MAX_QUEUE: int = 32
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0  # секунды ожидания в очереди
+    ADMISSION_RETRY_AFTER: int = 1  # секунды, заголовок Retry-After
 
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,19 +1,24 @@
 import logging
-from colorlog import ColoredFormatter
 import sys
 
 
 def setup_colored_logging():
-    formatter = ColoredFormatter(
-        "%(log_color)s%(levelname)-8s%(reset)s | %(blue)s%(name)s%(reset)s | %(message)s",
-        log_colors={
-            'DEBUG': 'cyan',
-            'INFO': 'green',
-            'WARNING': 'yellow',
-            'ERROR': 'red',
-            'CRITICAL': 'red,bg_white',
-        }
-    )
+    # colorlog импортируется лениво; без него используем обычный формат
+    try:
+        from colorlog import ColoredFormatter
+    except ImportError:
+        formatter = logging.Formatter("%(levelname)-8s | %(name)s | %(message)s")
+    else:
+        formatter = ColoredFormatter(
+            "%(log_color)s%(levelname)-8s%(reset)s | %(blue)s%(name)s%(reset)s | %(message)s",
+            log_colors={
+                'DEBUG': 'cyan',
+                'INFO': 'green',
+                'WARNING': 'yellow',
+                'ERROR': 'red',
+                'CRITICAL': 'red,bg_white',
+            }
+        )
 
     # Настраиваем консольный хендлер
     handler = logging.StreamHandler(sys.stdout)
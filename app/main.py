@@ -7,21 +7,31 @@ import json
 from datetime import datetime
 
 from app.utils.json_helpers import safe_json_dumps
+from app.config import settings
 from app.db.session import init_db
-from app.nats.client import init_nats, close_nats
+from app.nats.client import init_nats, close_nats, start_nats_background
 from app.ws.manager import manager
 from app.api.posts import router as posts_router
-from app.services.rss import background_rss_worker
+from app.api.health import router as health_router
+from app.middleware.admission import AdmissionControlMiddleware
+from app.services.rss import background_rss_worker, cancel_ingest
 
-setup_colored_logging()
 logger = logging.getLogger("uvicorn")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Старт
+    # Логирование (и colorlog) настраиваем при запуске, а не при импорте модуля
+    setup_colored_logging()
     await init_db()
-    await init_nats()
+    app.state.db_ready = True
+
+    if settings.STARTUP_MODE == "strict":
+        await init_nats()
+    else:
+        # Не ждём NATS: HTTP и WS доступны сразу, события буферизуются до подключения
+        start_nats_background()
 
     bg_task = asyncio.create_task(background_rss_worker())
     logger.info("Приложение запущено")
@@ -36,8 +46,11 @@ async def lifespan(app: FastAPI):
         await bg_task
     except asyncio.CancelledError:
         pass
+    # shield в run_ingest_once не даёт отмене дойти до цикла парсинга - отменяем его явно
+    await cancel_ingest()
 
     await close_nats()
+    app.state.db_ready = False
     logger.info("Приложение остановлено")
 
 
@@ -47,7 +60,10 @@ app = FastAPI(
     version="1.0"
 )
 
+app.add_middleware(AdmissionControlMiddleware)
+
 app.include_router(posts_router)
+app.include_router(health_router)
 
 
 @app.websocket("/ws/posts")
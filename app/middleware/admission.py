@@ -0,0 +1,145 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Dict, Tuple
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from app.config import settings
+from app.services.rss import is_ingest_running
+
+logger = logging.getLogger("uvicorn")
+
+# Пути, которые не ограничиваются: health-check, документация, WebSocket
+EXEMPT_PREFIXES = ("/health", "/docs", "/redoc", "/openapi.json", "/ws")
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+READ_PRIORITY = 0
+WRITE_PRIORITY = 1
+UNMATCHED_KEY = ("*", "<unmatched>")
+
+
+class PriorityLimiter:
+    """Ограничитель параллельности с ограниченной очередью ожидания и приоритетами"""
+
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: list = []  # куча [priority, seq, future]
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int, timeout: float) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._seq), future]
+        heapq.heappush(self._waiters, entry)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # release() передал слот в том же тике, что и таймаут - оставляем его себе
+                return True
+            self._remove(entry)
+            return False
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Слот уже был передан нам - возвращаем его
+                self.release()
+            else:
+                self._remove(entry)
+            raise
+
+    def release(self):
+        # Освободившийся слот передаём ожидающему с наивысшим приоритетом
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _remove(self, entry: list):
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+
+class AdmissionControlMiddleware:
+    """Ограничивает число одновременно обрабатываемых REST-запросов.
+
+    У каждого маршрута свой лимит, поверх действует общий лимит на все маршруты.
+    Чтения обслуживаются раньше записей. При переполненной очереди или
+    слишком долгом ожидании запрос сразу получает 503 с Retry-After.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.global_limiter = PriorityLimiter(
+            settings.ADMISSION_MAX_CONCURRENCY, settings.ADMISSION_MAX_QUEUE
+        )
+        self.route_limiters: Dict[Tuple[str, str], PriorityLimiter] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        # Повторный /posts/run просто ждёт уже идущий цикл парсинга - слот ему не нужен
+        if scope["method"] == "POST" and scope["path"] == "/posts/run" and is_ingest_running():
+            await self.app(scope, receive, send)
+            return
+
+        is_read = scope["method"] in READ_METHODS
+        priority = READ_PRIORITY if is_read else WRITE_PRIORITY
+        route_limiter = self._get_route_limiter(scope, is_read)
+
+        # Общий дедлайн на оба лимитера: суммарное ожидание не превышает ADMISSION_QUEUE_TIMEOUT
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ADMISSION_QUEUE_TIMEOUT
+        acquired = []
+        try:
+            for limiter in (route_limiter, self.global_limiter):
+                if not await limiter.acquire(priority, max(0.0, deadline - loop.time())):
+                    logger.warning(f"Перегрузка, запрос отклонён: {scope['method']} {scope['path']}")
+                    response = JSONResponse(
+                        {"detail": "Service overloaded, retry later"},
+                        status_code=503,
+                        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)}
+                    )
+                    await response(scope, receive, send)
+                    return
+                acquired.append(limiter)
+
+            await self.app(scope, receive, send)
+        finally:
+            for limiter in reversed(acquired):
+                limiter.release()
+
+    def _get_route_limiter(self, scope, is_read: bool) -> PriorityLimiter:
+        # Ключ - шаблон маршрута, а не конкретный путь, чтобы /posts/1 и /posts/2 делили лимит.
+        # Match.FULL означает, что и путь, и метод поддерживаются маршрутом, поэтому число
+        # ключей ограничено; всё остальное (404/405 с любым методом) попадает в одну корзину
+        key = UNMATCHED_KEY
+        app = scope.get("app")
+        if app is not None:
+            for route in app.router.routes:
+                match, _ = route.matches(scope)
+                if match == Match.FULL:
+                    key = (scope["method"], route.path)
+                    break
+
+        limiter = self.route_limiters.get(key)
+        if limiter is None:
+            if key == UNMATCHED_KEY or is_read:
+                limit = settings.ADMISSION_READ_ROUTE_LIMIT
+            else:
+                limit = settings.ADMISSION_WRITE_ROUTE_LIMIT
+            limiter = PriorityLimiter(limit, settings.ADMISSION_ROUTE_MAX_QUEUE)
+            self.route_limiters[key] = limiter
+        return limiter
@@ -14,5 +14,6 @@ class RSSPost(Base):
     author = Column(String(100))
     category = Column(String(100))   # hub / tag
     source = Column(String(50), default="habr")  # "habr", "manual", "external"
+    content_hash = Column(String(64))  # sha256 от title/summary/category/author
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
\ No newline at end of file
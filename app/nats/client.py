@@ -1,54 +1,171 @@
+import asyncio
 import logging
-from nats.aio.client import Client as NATS
+from collections import deque
+from typing import TYPE_CHECKING, Optional
 from app.config import settings
 from app.ws.manager import manager
 from app.schemas.post import RSSUpdateEvent
 
+if TYPE_CHECKING:
+    from nats.aio.client import Client as NATS
+
 logger = logging.getLogger("uvicorn")
-nc: NATS = None
+nc: "NATS" = None
+_connect_task: Optional[asyncio.Task] = None
+# Исходящие события, накопленные до подключения к NATS
+_pending: deque = deque(maxlen=settings.NATS_BUFFER_SIZE)
+_dropped_events = 0
 
 
-async def init_nats():
+# Подписка на события (внешние посты)
+async def message_handler(msg):
+    try:
+        data = msg.data.decode()
+        event = RSSUpdateEvent.model_validate_json(data)
+        logger.info(f"NATS received: [{event.source}] {event.title}")
+
+        # Отправляем в WebSocket
+        await manager.broadcast({
+            "event": "external_post",
+            "payload": event.model_dump(),
+            "timestamp": event.model_dump().get("timestamp", None)
+        })
+    except Exception as e:
+        logger.error(f"NATS handler error: {e}")
+
+
+async def _flush_pending(client) -> int:
+    """Отправляет накопленные события; при ошибке событие возвращается в начало буфера"""
+    flushed = 0
+    while _pending:
+        subject, data = _pending.popleft()
+        try:
+            await client.publish(subject, data)
+        except Exception:
+            _pending.appendleft((subject, data))
+            raise
+        flushed += 1
+    return flushed
+
+
+async def error_handler(e):
+    # Без traceback: при недоступном NATS nats-py вызывает колбэк на каждую попытку
+    logger.warning(f"NATS error: {e}")
+
+
+async def _connect():
     global nc
+    # nats-py импортируется лениво, чтобы не замедлять старт приложения
+    from nats.aio.client import Client as NATS
+
+    client = NATS()
+    try:
+        # nats-py сам повторяет подключение бесконечно при любом max_reconnect_attempts <= 0,
+        # поэтому первое подключение ограничиваем по времени: повторами управляет
+        # _connect_with_backoff, а в режиме "strict" старт должен завершиться ошибкой
+        try:
+            await asyncio.wait_for(
+                client.connect(
+                    settings.NATS_URL,
+                    connect_timeout=settings.NATS_CONNECT_TIMEOUT,
+                    allow_reconnect=True,
+                    max_reconnect_attempts=1,
+                    error_cb=error_handler,
+                ),
+                settings.NATS_CONNECT_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            raise ConnectionError(
+                f"не удалось подключиться к {settings.NATS_URL} "
+                f"за {settings.NATS_CONNECT_TIMEOUT} сек: {client.last_error}"
+            ) from None
+        # Соединение установлено - дальше переподключаемся без ограничений
+        client.options["max_reconnect_attempts"] = -1
+        await client.subscribe(settings.NATS_SUBJECT, cb=message_handler)
+
+        # Отправляем накопленные события до того, как публикация пойдёт напрямую
+        flushed = await _flush_pending(client)
+    except BaseException:
+        # BaseException: при отмене (остановка приложения) клиент тоже нужно закрыть
+        try:
+            await client.close()
+        except Exception:
+            pass
+        raise
+
+    logger.info("NATS подключен")
+    logger.info(f"Подписка NATS на канал: {settings.NATS_SUBJECT}")
+    if flushed:
+        logger.info(f"NATS: отправлено {flushed} накопленных событий")
+
+    nc = client
+
+
+async def init_nats():
     try:
-        nc = NATS()
-        await nc.connect(settings.NATS_URL)
-        logger.info("NATS подключен")
+        await _connect()
     except Exception as e:
         logger.error(f"Ошибка подключения к NATS: {e}")
         raise
 
-    # Подписка на события (внешние посты)
-    async def message_handler(msg):
+
+async def _connect_with_backoff():
+    delay = settings.NATS_RECONNECT_MIN_DELAY
+    while True:
         try:
-            data = msg.data.decode()
-            event = RSSUpdateEvent.model_validate_json(data)
-            logger.info(f"NATS received: [{event.source}] {event.title}")
-
-            # Отправляем в WebSocket
-            await manager.broadcast({
-                "event": "external_post",
-                "payload": event.model_dump(),
-                "timestamp": event.model_dump().get("timestamp", None)
-            })
+            await _connect()
+            return
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"NATS handler error: {e}")
+            logger.warning(f"NATS недоступен ({e}), повтор через {delay:g} сек")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.NATS_RECONNECT_MAX_DELAY)
+
+
+def start_nats_background():
+    """Запускает подключение к NATS в фоне, не блокируя старт приложения"""
+    global _connect_task
+    if _connect_task is None or _connect_task.done():
+        _connect_task = asyncio.create_task(_connect_with_backoff())
+
+
+def is_nats_connected() -> bool:
+    return nc is not None and nc.is_connected
+
+
+def pending_events_count() -> int:
+    return len(_pending)
 
-    await nc.subscribe(settings.NATS_SUBJECT, cb=message_handler)
-    logger.info(f"Подписка NATS на канал: {settings.NATS_SUBJECT}")
+
+def dropped_events_count() -> int:
+    return _dropped_events
+
+
+def is_nats_buffer_full() -> bool:
+    return len(_pending) >= _pending.maxlen
 
 
 async def publish_post_event(post_id: int, title: str, link: str, source: str = "habr"):
-    if not nc or not nc.is_connected:
-        return
+    global _dropped_events
     event = RSSUpdateEvent(
         post_id=post_id,
         title=title,
         link=link,
         source=source
     )
+    data = event.model_dump_json().encode()
+
+    # До первого подключения буферизуем; во время переподключения буферизует сам nats-py
+    if not nc or nc.is_closed:
+        if is_nats_buffer_full():
+            _dropped_events += 1
+            logger.warning("Буфер NATS переполнен, самое старое событие отброшено")
+        _pending.append((settings.NATS_SUBJECT, data))
+        return
+
     try:
-        await nc.publish(settings.NATS_SUBJECT, event.model_dump_json().encode())
+        await nc.publish(settings.NATS_SUBJECT, data)
         # Безопасное логирование заголовка
         safe_title = event.title[:30].strip()
         logger.info(f"NATS published: {safe_title}...")
@@ -57,7 +174,16 @@ async def publish_post_event(post_id: int, title: str, link: str, source: str =
 
 
 async def close_nats():
-    global nc
+    global nc, _connect_task
+    if _connect_task and not _connect_task.done():
+        _connect_task.cancel()
+        try:
+            await _connect_task
+        except asyncio.CancelledError:
+            pass
+    _connect_task = None
+
     if nc:
         await nc.close()
-        logger.info("NATS отключен")
\ No newline at end of file
+        nc = None
+        logger.info("NATS отключен")
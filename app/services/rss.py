@@ -1,8 +1,10 @@
-import feedparser
 import asyncio
-from typing import List, Optional
-from sqlalchemy import text
-from app.schemas.post import RSSPostCreate
+import hashlib
+import unicodedata
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import DateTime, bindparam, text
+from app.schemas.post import RSSPostCreate, RSSPostResponse
 from app.config import settings
 from app.models.post import RSSPost
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,12 +15,15 @@ from app.db.session import AsyncSessionLocal
 
 logger = logging.getLogger("uvicorn")
 background_task_running = True
+_ingest_task: Optional[asyncio.Task] = None
 
 
 async def fetch_rss_feed() -> Optional[List[RSSPostCreate]]:
     """Асинхронно получает и парсит RSS-ленту"""
     try:
         def _parse_feed(url):
+            # feedparser тяжёлый, импортируем только при первом парсинге
+            import feedparser
             return feedparser.parse(url)
 
         feed = await asyncio.to_thread(_parse_feed, settings.RSS_URL)
@@ -50,44 +55,154 @@ async def fetch_rss_feed() -> Optional[List[RSSPostCreate]]:
         return None
 
 
-async def save_posts_to_db(posts: List[RSSPostCreate], db: AsyncSession) -> int:
-    """Сохраняет новые посты (избегая дубликатов по `link`)"""
+def compute_content_hash(title: Optional[str], summary: Optional[str],
+                         category: Optional[str], author: Optional[str]) -> str:
+    """Хеш содержимого поста по нормализованным title, summary, category и author"""
+    def _normalize(value: Optional[str]) -> str:
+        if not value:
+            return ""
+        return " ".join(unicodedata.normalize("NFC", value).split())
+
+    raw = "\x1f".join(_normalize(v) for v in (title, summary, category, author))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def save_posts_to_db(posts: List[RSSPostCreate], db: AsyncSession) -> Tuple[int, int]:
+    """Сохраняет новые посты и обновляет изменённые (сравнение по content_hash).
+
+    Возвращает (добавлено, обновлено).
+    """
+    # Убираем дубликаты по `link` внутри одной выборки
+    posts_by_link = {post.link: post for post in posts}
+    if not posts_by_link:
+        return 0, 0
+
+    # Один запрос на весь цикл: все уже сохранённые посты из выборки
+    result = await db.execute(
+        text("SELECT * FROM rss_posts WHERE link IN :links").bindparams(
+            bindparam("links", expanding=True)
+        ),
+        {"links": list(posts_by_link)}
+    )
+    existing = {row.link: row for row in result.fetchall()}
+
     added = 0
-    for post_data in posts:
-        result = await db.execute(
-            text("SELECT 1 FROM rss_posts WHERE link = :link"),
-            {"link": post_data.link}
+    updates = []
+    backfills = []
+    updated_payloads = []
+    now = datetime.utcnow()
+
+    for link, post_data in posts_by_link.items():
+        content_hash = compute_content_hash(
+            post_data.title, post_data.summary, post_data.category, post_data.author
         )
-        if result.fetchone():
-            continue
+        row = existing.get(link)
 
-        db_post = RSSPost(**post_data.model_dump())
-        db.add(db_post)
-        await db.flush()
-        await db.refresh(db_post)
+        if row is None:
+            db_post = RSSPost(**post_data.model_dump(), content_hash=content_hash)
+            db.add(db_post)
+            await db.flush()
+            await db.refresh(db_post)
 
-        added += 1
+            added += 1
+
+            await publish_post_event(
+                post_id=db_post.id,
+                title=db_post.title,
+                link=db_post.link,
+                source=db_post.source
+            )
+
+            await manager.broadcast({
+                "event": "new_post",
+                "payload": {
+                    "id": db_post.id,
+                    "title": db_post.title,
+                    "link": db_post.link,
+                    "source": db_post.source,
+                    "category": db_post.category
+                }
+            })
+            continue
+
+        # Строки, сохранённые до появления content_hash, могли быть изменены вручную:
+        # записываем хеш из ленты без обновления. Правка в ленте, сделанная до этого
+        # цикла, будет подхвачена только при следующем её изменении
+        if row.content_hash is None:
+            backfills.append({"id": row.id, "content_hash": content_hash})
+            continue
+        if row.content_hash == content_hash:
+            continue
 
-        await publish_post_event(
-            post_id=db_post.id,
-            title=db_post.title,
-            link=db_post.link,
-            source=db_post.source
+        changes = {
+            "title": post_data.title,
+            "summary": post_data.summary,
+            "category": post_data.category,
+            "author": post_data.author,
+            "content_hash": content_hash,
+            "updated_at": now,
+        }
+        updates.append({"id": row.id, **changes})
+        updated_payloads.append(
+            RSSPostResponse.model_validate({**dict(row._mapping), **changes})
         )
 
-        await manager.broadcast({
-            "event": "new_post",
-            "payload": {
-                "id": db_post.id,
-                "title": db_post.title,
-                "link": db_post.link,
-                "source": db_post.source,
-                "category": db_post.category
-            }
-        })
+    if updates:
+        await db.execute(
+            text(
+                "UPDATE rss_posts SET title = :title, summary = :summary, category = :category, "
+                "author = :author, content_hash = :content_hash, updated_at = :updated_at "
+                "WHERE id = :id"
+            ).bindparams(bindparam("updated_at", type_=DateTime)),
+            updates
+        )
+    if backfills:
+        await db.execute(
+            text("UPDATE rss_posts SET content_hash = :content_hash WHERE id = :id"),
+            backfills
+        )
 
     await db.commit()
-    return added
+
+    for resp in updated_payloads:
+        await manager.broadcast({"event": "post_updated", "payload": resp.model_dump()})
+
+    return added, len(updated_payloads)
+
+
+async def _run_ingest() -> dict:
+    posts = await fetch_rss_feed()
+    if not posts:
+        return {"status": "error", "message": "Не удалось получить RSS"}
+
+    async with AsyncSessionLocal() as db:
+        added, updated = await save_posts_to_db(posts, db)
+    return {"status": "ok", "added": added, "updated": updated}
+
+
+async def run_ingest_once() -> dict:
+    """Один цикл парсинга RSS; параллельные вызовы ждут уже идущий цикл"""
+    global _ingest_task
+    if _ingest_task is None or _ingest_task.done():
+        _ingest_task = asyncio.create_task(_run_ingest())
+    # shield: отключение одного клиента не отменяет общий цикл
+    return await asyncio.shield(_ingest_task)
+
+
+def is_ingest_running() -> bool:
+    return _ingest_task is not None and not _ingest_task.done()
+
+
+async def cancel_ingest():
+    """Отменяет идущий цикл парсинга (при остановке приложения)"""
+    global _ingest_task
+    if _ingest_task and not _ingest_task.done():
+        _ingest_task.cancel()
+        try:
+            await _ingest_task
+        except asyncio.CancelledError:
+            pass
+    _ingest_task = None
 
 
 async def background_rss_worker():
@@ -96,16 +211,16 @@ async def background_rss_worker():
 
     while background_task_running:
         try:
-            posts = await fetch_rss_feed()
-            if posts:
-                async with AsyncSessionLocal() as db:
-                    added = await save_posts_to_db(posts, db)
-                    if added:
-                        logger.info(f"Добавлено {added} новых постов")
+            result = await run_ingest_once()
+            if result["status"] == "ok":
+                if result["added"]:
+                    logger.info(f"Добавлено {result['added']} новых постов")
+                if result["updated"]:
+                    logger.info(f"Обновлено {result['updated']} изменённых постов")
             else:
                 logger.warning("RSS-лента пуста или ошибка")
 
         except Exception as e:
             logger.error(f"Ошибка в фоновой задаче: {e}")
 
-        await asyncio.sleep(settings.BACKGROUND_TASK_INTERVAL)
\ No newline at end of file
+        await asyncio.sleep(settings.BACKGROUND_TASK_INTERVAL)
@@ -0,0 +1,70 @@
+import asyncio
+
+from app.middleware.admission import PriorityLimiter, READ_PRIORITY, WRITE_PRIORITY
+
+
+def test_release_at_timeout_does_not_leak_slot():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        limiter = PriorityLimiter(limit=1, max_queue=1)
+        assert await limiter.acquire(READ_PRIORITY, timeout=1)
+
+        # Замораживаем время, чтобы release() и таймаут ожидающего сработали
+        # в одном тике, причём release() - первым
+        now = loop.time()
+        loop.time = lambda: now
+        loop.call_at(now + 0.01, limiter.release)
+        waiter = asyncio.create_task(limiter.acquire(READ_PRIORITY, timeout=0.01))
+        await asyncio.sleep(0)
+        del loop.time
+
+        if await waiter:
+            limiter.release()
+
+        assert limiter.active == 0
+        assert not limiter._waiters
+
+    asyncio.run(scenario())
+
+
+def test_reads_are_admitted_before_writes():
+    async def scenario():
+        limiter = PriorityLimiter(limit=1, max_queue=10)
+        assert await limiter.acquire(READ_PRIORITY, timeout=1)
+        order = []
+
+        async def request(priority, name):
+            assert await limiter.acquire(priority, timeout=1)
+            order.append(name)
+            limiter.release()
+
+        tasks = [
+            asyncio.create_task(request(WRITE_PRIORITY, "write-1")),
+            asyncio.create_task(request(WRITE_PRIORITY, "write-2")),
+            asyncio.create_task(request(READ_PRIORITY, "read")),
+        ]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["read", "write-1", "write-2"]
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_rejected_immediately():
+    async def scenario():
+        limiter = PriorityLimiter(limit=1, max_queue=1)
+        assert await limiter.acquire(READ_PRIORITY, timeout=1)
+        waiter = asyncio.create_task(limiter.acquire(WRITE_PRIORITY, timeout=1))
+        await asyncio.sleep(0)
+
+        assert not await limiter.acquire(READ_PRIORITY, timeout=1)
+
+        limiter.release()
+        assert await waiter
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,145 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.config import settings
+from app.main import app as main_app
+from app.middleware.admission import AdmissionControlMiddleware, UNMATCHED_KEY
+from app.services import rss
+
+
+@pytest.fixture
+def tight_limits(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUE", 0)
+    monkeypatch.setattr(settings, "ADMISSION_READ_ROUTE_LIMIT", 1)
+    monkeypatch.setattr(settings, "ADMISSION_ROUTE_MAX_QUEUE", 0)
+    monkeypatch.setattr(settings, "ADMISSION_QUEUE_TIMEOUT", 1.0)
+    monkeypatch.setattr(settings, "ADMISSION_RETRY_AFTER", 7)
+
+
+def make_app(release: asyncio.Event) -> FastAPI:
+    test_app = FastAPI()
+    test_app.add_middleware(AdmissionControlMiddleware)
+
+    @test_app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    @test_app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    @test_app.get("/health/ready")
+    async def ready():
+        return {"status": "ready"}
+
+    @test_app.get("/ws/connections")
+    async def connections():
+        return {"total_connections": 0}
+
+    return test_app
+
+
+def find_admission(asgi_app) -> AdmissionControlMiddleware:
+    layer = asgi_app.middleware_stack
+    while not isinstance(layer, AdmissionControlMiddleware):
+        layer = layer.app
+    return layer
+
+
+async def hold_slow_request(client, release):
+    """Занимает единственный слот и ждёт, пока запрос дойдёт до обработчика"""
+    task = asyncio.create_task(client.get("/slow"))
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if find_admission(client._transport.app).global_limiter.active:
+            return task
+    raise AssertionError("slow request was not admitted")
+
+
+def test_full_queue_gets_503_with_retry_after(tight_limits):
+    async def scenario():
+        release = asyncio.Event()
+        test_app = make_app(release)
+        transport = httpx.ASGITransport(app=test_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            slow = await hold_slow_request(client, release)
+
+            rejected = await client.get("/slow")
+            other = await client.get("/fast")
+
+            release.set()
+            assert (await slow).status_code == 200
+        return rejected, other
+
+    rejected, other = asyncio.run(scenario())
+
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "7"
+    # Общий лимит тоже исчерпан: другой маршрут отклоняется сразу
+    assert other.status_code == 503
+
+
+def test_health_and_ws_paths_are_exempt(tight_limits):
+    async def scenario():
+        release = asyncio.Event()
+        test_app = make_app(release)
+        transport = httpx.ASGITransport(app=test_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            slow = await hold_slow_request(client, release)
+
+            health = await client.get("/health/ready")
+            connections = await client.get("/ws/connections")
+
+            release.set()
+            await slow
+        return health, connections
+
+    health, connections = asyncio.run(scenario())
+
+    assert health.status_code == 200
+    assert connections.status_code == 200
+
+
+def test_unmatched_requests_share_one_limiter():
+    async def scenario():
+        test_app = make_app(asyncio.Event())
+        transport = httpx.ASGITransport(app=test_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for method in ("GET", "POST", "FOO", "BAR"):
+                await client.request(method, "/missing")
+            await client.request("BAZ", "/fast")
+            await client.get("/fast")
+        return find_admission(test_app)
+
+    middleware = asyncio.run(scenario())
+
+    assert set(middleware.route_limiters) == {UNMATCHED_KEY, ("GET", "/fast")}
+
+
+def test_concurrent_run_calls_share_one_ingest(monkeypatch):
+    calls = 0
+
+    async def slow_fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return None
+
+    monkeypatch.setattr(rss, "fetch_rss_feed", slow_fetch)
+    monkeypatch.setattr(rss, "_ingest_task", None)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/posts/run") for _ in range(6)))
+
+    responses = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.text for response in responses}) == 1
@@ -0,0 +1,52 @@
+import asyncio
+from collections import deque
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.main import app
+from app.nats import client as nats_client
+
+
+@pytest.fixture
+def fast_mode(monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_MODE", "fast")
+    monkeypatch.setattr(nats_client, "nc", None)
+    monkeypatch.setattr(nats_client, "_pending", deque(maxlen=2))
+    monkeypatch.setattr(nats_client, "_dropped_events", 0)
+    monkeypatch.setattr(app.state, "db_ready", True, raising=False)
+
+
+def get_ready():
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/health/ready")
+
+    return asyncio.run(request())
+
+
+def test_ready_in_fast_mode_while_buffer_has_room(fast_mode):
+    nats_client._pending.append((settings.NATS_SUBJECT, b"{}"))
+
+    response = get_ready()
+
+    assert response.status_code == 200
+    assert response.json()["checks"] == {"database": True, "nats": False, "nats_buffer": True}
+
+
+def test_not_ready_in_fast_mode_when_buffer_is_full(fast_mode):
+    nats_client._pending.extend([(settings.NATS_SUBJECT, b"{}")] * 2)
+
+    response = get_ready()
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "not_ready"
+    assert response.json()["checks"]["nats_buffer"] is False
+
+
+def test_not_ready_in_strict_mode_without_nats(fast_mode, monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_MODE", "strict")
+
+    assert get_ready().status_code == 503
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import socket
+from collections import deque
+
+import pytest
+
+from app.config import settings
+from app.nats import client as nats_client
+
+
+@pytest.fixture
+def unreachable_nats(monkeypatch):
+    # Свободный порт, на котором никто не слушает
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    monkeypatch.setattr(settings, "NATS_URL", f"nats://127.0.0.1:{port}")
+    monkeypatch.setattr(settings, "NATS_CONNECT_TIMEOUT", 0.5)
+    monkeypatch.setattr(settings, "NATS_RECONNECT_MIN_DELAY", 0.1)
+    monkeypatch.setattr(nats_client, "nc", None)
+    monkeypatch.setattr(nats_client, "_connect_task", None)
+
+
+@pytest.fixture
+def small_buffer(monkeypatch):
+    monkeypatch.setattr(nats_client, "nc", None)
+    monkeypatch.setattr(nats_client, "_pending", deque(maxlen=2))
+    monkeypatch.setattr(nats_client, "_dropped_events", 0)
+
+
+def test_strict_connect_fails_when_nats_is_down(unreachable_nats):
+    async def scenario():
+        # Внешний таймаут лишь страхует от зависания: ожидается собственная ошибка подключения
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(nats_client.init_nats(), 5)
+
+    asyncio.run(scenario())
+
+
+def test_background_connect_backs_off_and_stops_on_close(unreachable_nats, caplog):
+    async def scenario():
+        nats_client.start_nats_background()
+        await asyncio.sleep(1.5)
+        await nats_client.close_nats()
+
+        # Ни задача подключения, ни недостроенный клиент не остаются висеть
+        others = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        assert others == []
+
+    with caplog.at_level(logging.WARNING, logger="uvicorn"):
+        asyncio.run(scenario())
+
+    assert any("повтор через" in record.getMessage() for record in caplog.records)
+    assert not nats_client.is_nats_connected()
+
+
+def test_publish_buffers_until_connected(small_buffer):
+    asyncio.run(nats_client.publish_post_event(1, "title", "https://example.com/1"))
+
+    assert nats_client.pending_events_count() == 1
+    assert not nats_client.is_nats_buffer_full()
+    assert nats_client.dropped_events_count() == 0
+
+
+def test_full_buffer_drops_oldest_event(small_buffer):
+    async def scenario():
+        for post_id in (1, 2, 3):
+            await nats_client.publish_post_event(post_id, "title", f"https://example.com/{post_id}")
+
+    asyncio.run(scenario())
+
+    assert nats_client.is_nats_buffer_full()
+    assert nats_client.dropped_events_count() == 1
+    links = [data for _, data in nats_client._pending]
+    assert b"https://example.com/1" not in links[0]
+    assert b"https://example.com/2" in links[0]
+    assert b"https://example.com/3" in links[1]
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.post import Base
+from app.schemas.post import RSSPostCreate, RSSPostResponse
+from app.services import rss
+
+
+def make_post(link="https://habr.com/1", title="Заголовок", summary="Текст"):
+    return RSSPostCreate(
+        title=title, link=link, summary=summary,
+        published="2024-01-01", author="author", category="python"
+    )
+
+
+@pytest.fixture
+def ingest(monkeypatch):
+    """Запускает сценарий с in-memory SQLite; возвращает события WebSocket и UPDATE-запросы"""
+    broadcasts = []
+    updates = []
+
+    async def fake_broadcast(message, exclude=None):
+        broadcasts.append(message)
+
+    async def fake_publish(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(rss.manager, "broadcast", fake_broadcast)
+    monkeypatch.setattr(rss, "publish_post_event", fake_publish)
+
+    def run(scenario):
+        async def main():
+            engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            @event.listens_for(engine.sync_engine, "before_cursor_execute")
+            def record(conn, cursor, statement, parameters, context, executemany):
+                if statement.lstrip().upper().startswith("UPDATE"):
+                    updates.append(statement)
+
+            session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            try:
+                async with session_factory() as db:
+                    return await scenario(db)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run, broadcasts, updates
+
+
+def test_unchanged_entry_is_not_updated(ingest):
+    run, broadcasts, updates = ingest
+
+    async def scenario(db):
+        assert await rss.save_posts_to_db([make_post()], db) == (1, 0)
+        broadcasts.clear()
+        return await rss.save_posts_to_db([make_post()], db)
+
+    assert run(scenario) == (0, 0)
+    assert updates == []
+    assert broadcasts == []
+
+
+def test_edited_entry_is_updated_once(ingest):
+    run, broadcasts, updates = ingest
+
+    async def scenario(db):
+        await rss.save_posts_to_db([make_post()], db)
+        broadcasts.clear()
+        result = await rss.save_posts_to_db([make_post(title="Новый заголовок")], db)
+        row = (await db.execute(text("SELECT title FROM rss_posts"))).fetchone()
+        return result, row.title
+
+    result, stored_title = run(scenario)
+
+    assert result == (0, 1)
+    assert stored_title == "Новый заголовок"
+    assert len(updates) == 1
+    assert len(broadcasts) == 1
+    assert broadcasts[0]["event"] == "post_updated"
+    # Та же форма payload, что и у PATCH /posts/{id}
+    payload = broadcasts[0]["payload"]
+    assert set(payload) == set(RSSPostResponse.model_fields)
+    assert payload["title"] == "Новый заголовок"
+
+
+def test_legacy_row_without_hash_is_backfilled_silently(ingest):
+    run, broadcasts, updates = ingest
+
+    async def scenario(db):
+        await rss.save_posts_to_db([make_post()], db)
+        # Строка до миграции, к тому же отредактированная вручную
+        await db.execute(text("UPDATE rss_posts SET content_hash = NULL, title = 'Ручная правка'"))
+        await db.commit()
+        broadcasts.clear()
+        updates.clear()
+
+        result = await rss.save_posts_to_db([make_post()], db)
+        row = (await db.execute(text("SELECT title, content_hash FROM rss_posts"))).fetchone()
+        return result, row
+
+    result, row = run(scenario)
+
+    assert result == (0, 0)
+    assert broadcasts == []
+    assert len(updates) == 1
+    assert row.title == "Ручная правка"
+    post = make_post()
+    assert row.content_hash == rss.compute_content_hash(
+        post.title, post.summary, post.category, post.author
+    )
+
+
+def test_duplicate_links_in_one_batch_are_inserted_once(ingest):
+    run, broadcasts, updates = ingest
+
+    async def scenario(db):
+        result = await rss.save_posts_to_db([make_post(), make_post(title="Другой")], db)
+        count = (await db.execute(text("SELECT COUNT(*) FROM rss_posts"))).scalar()
+        return result, count
+
+    result, count = run(scenario)
+
+    assert result == (1, 0)
+    assert count == 1
+    assert [message["event"] for message in broadcasts] == ["new_post"]